@@ -32,7 +32,7 @@ echo "Updating ${VERSION_FILEPATH}..."
 echo "MAJOR_VERSION = ${MAJOR_VERSION}"$'\r' > ${VERSION_FILEPATH}
 echo "MINOR_VERSION = ${MINOR_VERSION}"$'\r' >> ${VERSION_FILEPATH}
 echo "PATCH_VERSION = ${PATCH_VERSION}"$'\r' >> ${VERSION_FILEPATH}
-echo "version = '{}.{}.{}'.format(MAJOR_VERSION, MINOR_VERSION, PATCH_VERSION)"$'\r' >> ${VERSION_FILEPATH}
+echo "version = '${FULL_VERSION}'"$'\r' >> ${VERSION_FILEPATH}
 
 echo "__all__  = ['MAJOR_VERSION', 'MINOR_VERSION', 'PATCH_VERSION', 'version']"$'\r' >> ${VERSION_FILEPATH}
 
@@ -1,26 +1,33 @@
 """Base functions dealing with an SQL database."""
 
 import re
+import sys
+import time
 import uuid
+import queue
+import functools
+import threading
 import sqlalchemy as sa
 import sqlalchemy.exc as se
-import psycopg as ps
 
 from mt import tp, logg, pd, ctx
-from mt.halo import Halo
 
 
 __all__ = [
     "frame_sql",
+    "frame_sql_cached",
     "indices",
     "run_func",
+    "make_engine",
     "conn_ctx",
     "engine_execute",
     "read_sql",
+    "iter_sql",
     "read_sql_table",
     "exec_sql",
     "list_schemas",
     "list_tables",
+    "list_all_tables",
     "list_views",
     "table_exists",
     "create_temp_id_table",
@@ -31,7 +38,11 @@ __all__ = [
 
 
 def frame_sql(frame_name, schema: tp.Optional[str] = None):
-    return frame_name if schema is None else "{}.{}".format(schema, frame_name)
+    return frame_name if schema is None else f"{schema}.{frame_name}"
+
+
+# for hot loops that keep referring to the same few frames
+frame_sql_cached = functools.lru_cache(maxsize=1024)(frame_sql)
 
 
 def indices(df):
@@ -43,15 +54,41 @@ def indices(df):
 # ----- functions dealing with sql queries to overcome OperationalError -----
 
 
+def _psycopg_operational_error():
+    """Returns psycopg's OperationalError without importing psycopg.
+
+    If psycopg has not been imported by anyone, it cannot have raised anything, and
+    sqlalchemy's OperationalError is returned as a harmless stand-in.
+    """
+    ps = sys.modules.get("psycopg")
+    return se.OperationalError if ps is None else ps.OperationalError
+
+
+# exceptions that retrying cannot fix, and exceptions worth a retry
+_FATAL_EXCS = (se.ProgrammingError, se.IntegrityError)
+_RETRY_EXCS = (
+    se.DatabaseError,
+    se.OperationalError,
+    se.InterfaceError,
+    se.PendingRollbackError,
+)
+
+
 def run_func(
     func,
     *args,
-    nb_trials: int = 3,
+    nb_trials: int = 2,
     logger: tp.Optional[logg.IndentedLoggerAdapter] = None,
     **kwargs,
 ):
     """Attempt to run a function a number of times to overcome OperationalError exceptions.
 
+    Stale pooled connections are best dealt with at the engine level, via `pool_pre_ping` (see
+    :func:`make_engine`). The retries here are for genuinely transient server errors. After an
+    error that sqlalchemy identifies as a disconnect, the connection pool of the first engine found
+    in `args` is disposed before retrying, so that the next attempt does not reuse a dead
+    connection.
+
     Parameters
     ----------
     func: function
@@ -68,15 +105,16 @@ def run_func(
     for x in range(nb_trials):
         try:
             return func(*args, **kwargs)
-        except (se.ProgrammingError, se.IntegrityError):
+        except _FATAL_EXCS:
             raise
-        except (
-            se.DatabaseError,
-            se.OperationalError,
-            ps.OperationalError,
-            se.InterfaceError,
-            se.PendingRollbackError,
-        ):
+        except (*_RETRY_EXCS, _psycopg_operational_error()) as e:
+            # only a disconnect warrants it: on an in-memory sqlite engine, disposing the pool
+            # would throw away the whole database
+            if getattr(e, "connection_invalidated", False):
+                for arg in args:
+                    if isinstance(arg, sa.engine.Engine):
+                        arg.dispose()
+                        break
             if logger:
                 msg = f"Ignored an exception raised by failed attempt {x+1}/{nb_trials} to execute `{func.__module__}.{func.__name__}()`"
                 with logger.scoped_warn(msg):
@@ -86,22 +124,140 @@ def run_func(
     )
 
 
+def make_engine(url, **kwargs) -> sa.engine.Engine:
+    """Creates an sqlalchemy engine with pre-pinged pooling and fast executemany by default.
+
+    Parameters
+    ----------
+    url : str or sqlalchemy.engine.URL
+        the database url
+    kwargs : dict
+        other keyword arguments to be passed as-is to :func:`sqlalchemy.create_engine`. They
+        override the defaults set by this function.
+
+    Returns
+    -------
+    sqlalchemy.engine.Engine
+        the connection engine
+
+    Notes
+    -----
+    Pooled connections are pinged before use and recycled after an hour, so that connections
+    dropped by the server or by a firewall are replaced transparently instead of failing a query.
+
+    For psycopg2, executemany is switched to the 'values_plus_batch' mode so that executing a
+    statement with a list of parameter sets costs a few round trips instead of one per row.
+    Other drivers, like psycopg 3, already batch or pipeline their executemany and are left with
+    the sqlalchemy defaults.
+    """
+    url = sa.engine.make_url(url)
+    kwargs.setdefault("pool_pre_ping", True)
+    kwargs.setdefault("pool_recycle", 3600)
+    if url.get_driver_name() == "psycopg2":
+        kwargs.setdefault("executemany_mode", "values_plus_batch")
+        kwargs.setdefault("executemany_batch_page_size", 500)
+    return sa.create_engine(url, **kwargs)
+
+
 def conn_ctx(engine):
     if isinstance(engine, sa.engine.Engine):
         return engine.begin()
     return ctx.nullcontext(engine)
 
 
+_cached_text = functools.lru_cache(maxsize=1024)(sa.text)
+
+# longer queries are mostly one-offs with inlined literals, not worth pinning in the cache
+_TEXT_CACHE_MAX_LEN = 4096
+
+
+def _text(sql: str):
+    """Cached :func:`sqlalchemy.text`, skipping the bind parameter scan of repeated queries.
+
+    Only queries of up to `_TEXT_CACHE_MAX_LEN` characters are cached, so the cache holds at most
+    a few megabytes. Sharing the clauses is safe because their generative methods return copies.
+    """
+    if len(sql) > _TEXT_CACHE_MAX_LEN:
+        return sa.text(sql)
+    return _cached_text(sql)
+
+
 def engine_execute(engine, sql, *args, **kwargs):
-    text_sql = sa.text(sql) if isinstance(sql, str) else sql
+    text_sql = _text(sql) if isinstance(sql, str) else sql
     with conn_ctx(engine) as conn:
         return conn.execute(text_sql, *args, **kwargs)
 
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _exec_raw(engine, sql: str):
+    """Executes a parameterless SQL string, without building and compiling a TextClause.
+
+    The string goes straight to the DBAPI cursor. Colons need no escaping, and percent signs are
+    escaped here for drivers that interpolate the string even when there is no parameter.
+    """
+    if engine.dialect.paramstyle in ("format", "pyformat"):
+        sql = sql.replace("%", "%%")
+    with conn_ctx(engine) as conn:
+        return conn.exec_driver_sql(sql)
+
+
 def trim_sql_query(sql_query: str) -> str:
-    sql_query = " ".join(sql_query.splitlines())
-    sql_query = " ".join(sql_query.split())
-    return sql_query
+    return _WHITESPACE_RE.sub(" ", sql_query).strip()
+
+
+def _prefetch(iterator, maxsize: int = 2):
+    """Iterates over an iterator in a background thread, keeping up to `maxsize` items ahead.
+
+    An exception raised by the iterator is re-raised as-is in the consuming thread.
+    """
+    from mt.base.bg_invoke import BgInvoke
+
+    q = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iterator:
+                q.put((True, item))
+                if stop.is_set():
+                    return
+        except BaseException as e:  # handed over to the consumer
+            q.put((False, e))
+            return
+        q.put((False, None))
+
+    bg = BgInvoke(produce)
+    try:
+        while True:
+            ok, item = q.get()
+            if ok:
+                yield item
+            elif item is None:
+                return
+            else:
+                raise item
+    finally:
+        # unblock the producer and wait for it to finish, so the iterator is no longer in use
+        stop.set()
+        while bg.is_running():
+            try:
+                q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+class _NullSpinner:
+    """A stand-in for :class:`mt.halo.Halo` that displays nothing."""
+
+    text = ""
+
+    def succeed(self, text=None):
+        pass
+
+    def fail(self, text=None):
+        pass
 
 
 def read_sql(
@@ -118,7 +274,8 @@ def read_sql(
 
     The function wraps :func:`pandas.read_sql_query`. However, when `chunksize` is not None, it
     iterates over chunks and concatenates them. In addition, if `logger` is not None, a progress
-    bar is shown in that case.
+    bar is shown in that case. The chunks are streamed from a server-side cursor where the
+    dialect supports it, so that the whole result set is not buffered on the client side.
 
     A dataframe is always returned.
 
@@ -145,12 +302,14 @@ def read_sql(
     logger: mt.logg.IndentedLoggerAdapter, optional
         logger for debugging
     kwargs: dict
-        other keyword arguments to be passed directly to :func:`pandas.read_sql_query`
+        other keyword arguments to be passed directly to :func:`pandas.read_sql_query`. For
+        example, `dtype_backend="pyarrow"` makes each chunk Arrow-backed if pyarrow is installed.
 
     Returns
     -------
     pandas.DataFrame
-        the output dataframe
+        the output dataframe. If `chunksize` is provided and `index_col` is None, the index of the
+        concatenated dataframe is a fresh range index.
 
     See Also
     --------
@@ -159,18 +318,30 @@ def read_sql(
 
     if isinstance(sql, str):
         text_sql = sql
-        sql = sa.text(text_sql)
+        sql = _text(text_sql)
     else:
-        text_sql = str(sql.compile(compile_kwargs={"literal_binds": True}))
-    text_sql = trim_sql_query(text_sql)
+        text_sql = None
 
     if chunksize is not None:
-        s = "read_sql: '{}'".format(text_sql)
-        spinner = Halo(s, spinner="dots", enabled=bool(logger))
-        spinner.start()
-        ts = pd.Timestamp.now()
+        if logger:  # only render the query with literal binds when it is actually displayed
+            from mt.halo import Halo
+
+            if text_sql is None:
+                text_sql = str(sql.compile(compile_kwargs={"literal_binds": True}))
+            s = "read_sql: '{}'".format(trim_sql_query(text_sql))
+            spinner = Halo(s, spinner="dots")
+            spinner.start()
+        else:
+            spinner = _NullSpinner()
+        ts = time.monotonic()
+        last_update = ts
         cnt = 0
 
+    if chunksize is not None:  # pandas fetches each chunk with a single fetchmany(chunksize)
+        sql = sql.execution_options(stream_results=True)
+
+    # the chunks must be consumed before the connection is released, otherwise a server-side
+    # cursor would be closed together with its transaction
     with conn_ctx(engine) as conn:
         res = run_func(
             pd.read_sql,
@@ -183,43 +354,110 @@ def read_sql(
             **kwargs,
         )
 
-    if chunksize is None:
-        return res
+        if chunksize is None:
+            return res
 
-    try:
-        dfs = []
-        for df in res:
-            dfs.append(df)
-            cnt += len(df)
-            td = (pd.Timestamp.now() - ts).total_seconds() + 0.001
-            s = "{} rows ({} rows/sec)".format(cnt, cnt / td)
-            spinner.text = s
-        df = pd.concat(dfs)
-        s = "{} rows".format(cnt)
-        spinner.succeed(s)
-    except:
-        s = "{} rows".format(cnt)
-        spinner.fail(s)
-        if logger:
-            logger.warn_last_exception()
-        if exception_handling == "raise":
-            raise
-        if exception_handling != "warn":
-            raise ValueError(
-                "Unknown value for argument 'exception_handling': '{}'.".format(
-                    exception_handling
-                )
-            )
-        df = pd.concat(dfs)
+        # fetch the next chunk while the current one is being processed, except for sqlite
+        # which is in-process and whose connections may be bound to the current thread
+        if conn.dialect.name != "sqlite":
+            res = _prefetch(res)
+
+        # close the chunk iterator on any exit, so that a prefetching thread is stopped before
+        # the connection is released
+        try:
+            try:
+                dfs = []
+                for df in res:
+                    dfs.append(df)
+                    cnt += len(df)
+                    now = time.monotonic()
+                    if now - last_update > 0.25:  # throttle spinner updates
+                        last_update = now
+                        td = now - ts + 0.001
+                        spinner.text = "{} rows ({} rows/sec)".format(cnt, cnt / td)
+                df = pd.concat(dfs, ignore_index=index_col is None)
+                s = "{} rows".format(cnt)
+                spinner.succeed(s)
+            except:
+                s = "{} rows".format(cnt)
+                spinner.fail(s)
+                if logger:
+                    logger.warn_last_exception()
+                if exception_handling == "raise":
+                    raise
+                if exception_handling != "warn":
+                    raise ValueError(
+                        "Unknown value for argument 'exception_handling': '{}'.".format(
+                            exception_handling
+                        )
+                    )
+                df = pd.concat(dfs, ignore_index=index_col is None)
+        finally:
+            res.close()
 
     return df
 
 
+def iter_sql(
+    sql,
+    engine,
+    chunksize: int,
+    index_col: tp.Union[str, tp.List[str], None] = None,
+    params: tp.Optional[dict] = None,
+) -> tp.Iterator[pd.DataFrame]:
+    """Iterates over the result of an SQL query, one dataframe per chunk of rows.
+
+    Unlike :func:`read_sql`, which goes through :func:`pandas.read_sql_query`, the rows are
+    fetched from a server-side cursor where the dialect supports it, via
+    :meth:`sqlalchemy.engine.Result.partitions`, and each chunk is turned into a dataframe right
+    away. Hence, only about one chunk of rows is held in memory at any time. There is no retry, as
+    a partially consumed result cannot be resumed.
+
+    Parameters
+    ----------
+    sql : str or object
+        SQL query to be executed. The query can be a string or an sqlalchemy object that can be
+        used for querying.
+    engine : sqlalchemy.engine.Engine or sqlalchemy.engine.Connection
+        connection engine to the server. If it is an engine, a connection is held until the
+        iteration is over.
+    chunksize : int
+        number of rows per chunk
+    index_col: string or list of strings, optional, default: None
+        Column(s) to set as index(MultiIndex)
+    params : dict, optional
+        parameters to be bound to the query
+
+    Yields
+    ------
+    pandas.DataFrame
+        a chunk of at most `chunksize` rows
+    """
+    if isinstance(sql, str):
+        sql = _text(sql)
+    sql = sql.execution_options(stream_results=True, max_row_buffer=chunksize)
+
+    with conn_ctx(engine) as conn:
+        result = conn.execute(sql, params)
+        columns = list(result.keys())
+        for rows in result.partitions(chunksize):
+            yield pd.DataFrame.from_records(rows, columns=columns, index=index_col)
+
+
+def _adbc_read_sql(url: str, sql: str) -> pd.DataFrame:
+    import adbc_driver_postgresql.dbapi as adbc
+
+    with adbc.connect(url) as conn, conn.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetch_arrow_table().to_pandas()
+
+
 def read_sql_table(
     table_name,
     engine,
     nb_trials: int = 3,
     logger: tp.Optional[logg.IndentedLoggerAdapter] = None,
+    backend: str = "pandas",
     **kwargs,
 ):
     """Read an SQL table with a number of trials to overcome OperationalError.
@@ -234,20 +472,61 @@ def read_sql_table(
         number of query trials
     logger: mt.logg.IndentedLoggerAdapter, optional
         logger for debugging
+    backend : {'pandas', 'connectorx', 'adbc'}
+        the library that downloads the table. 'pandas' goes through the sqlalchemy engine.
+        'connectorx' and 'adbc' open their own connection to the server, fetch the table in the
+        binary protocol and build the columns in native code, which is faster and uses much less
+        peak memory for large tables. They require packages `connectorx` and
+        `adbc_driver_postgresql` respectively, and 'adbc' only supports PostgreSQL.
+    kwargs: dict
+        other keyword arguments to be passed directly to :func:`pandas.read_sql_table`. Only
+        `schema` is supported by the non-pandas backends.
 
     See Also
     --------
     pandas.read_sql_table
 
     """
-    return run_func(
-        pd.read_sql_table,
-        table_name,
-        engine,
-        nb_trials=nb_trials,
-        logger=logger,
-        **kwargs,
-    )
+    if backend == "pandas":
+        return run_func(
+            pd.read_sql_table,
+            table_name,
+            engine,
+            nb_trials=nb_trials,
+            logger=logger,
+            **kwargs,
+        )
+
+    schema = kwargs.pop("schema", None)
+    if kwargs:
+        raise ValueError(
+            f"Backend '{backend}' does not support keyword arguments {list(kwargs)}."
+        )
+    table = sa.table(table_name, schema=schema)
+    sql = str(sa.select(sa.text("*")).select_from(table).compile(dialect=engine.dialect))
+    url = engine.url.set(drivername=engine.url.get_backend_name())
+    url = url.render_as_string(hide_password=False)
+
+    if backend == "connectorx":
+        import connectorx as cx
+
+        return run_func(
+            cx.read_sql,
+            url,
+            sql,
+            return_type="pandas",
+            nb_trials=nb_trials,
+            logger=logger,
+        )
+
+    if backend == "adbc":
+        if engine.dialect.name != "postgresql":
+            raise ValueError(
+                f"Backend 'adbc' does not support dialect '{engine.dialect.name}'."
+            )
+        return run_func(_adbc_read_sql, url, sql, nb_trials=nb_trials, logger=logger)
+
+    raise ValueError(f"Unknown value for argument 'backend': '{backend}'.")
 
 
 def exec_sql(
@@ -267,7 +546,10 @@ def exec_sql(
     engine : sqlalchemy.engine.Engine
         connection engine to the server
     args : list
-        positional arguments to be passed as-is to :func:`sqlalchemy.engine.Engine.execute`
+        positional arguments to be passed as-is to :func:`sqlalchemy.engine.Engine.execute`. If
+        the first one is a list of parameter dictionaries, the query is executed once per
+        dictionary via the driver's executemany, which is batched for engines created by
+        :func:`make_engine`.
     nb_trials: int
         number of query trials
     logger: mt.logg.IndentedLoggerAdapter, optional
@@ -287,6 +569,23 @@ def exec_sql(
 # ----- functions navigating the database -----
 
 
+def _inspect(engine):
+    """Returns an inspector of the engine, reusing the one built by a previous call if any.
+
+    Building an inspector from an engine checks out a connection, so it is only done once per
+    engine. The reflection cache of a reused inspector is cleared, so results are never stale.
+    """
+    if not isinstance(engine, sa.engine.Engine):
+        return sa.inspect(engine)
+    inspector = getattr(engine, "_mt_inspector", None)
+    if inspector is None:
+        inspector = sa.inspect(engine)
+        engine._mt_inspector = inspector  # lives and dies with the engine
+    else:
+        inspector.clear_cache()
+    return inspector
+
+
 def list_schemas(engine):
     """Lists all schemas.
 
@@ -300,7 +599,7 @@ def list_schemas(engine):
     list
         list of all schema names
     """
-    return sa.inspect(engine).get_schema_names()
+    return _inspect(engine).get_schema_names()
 
 
 def list_tables(engine, schema: tp.Optional[str] = None):
@@ -318,7 +617,54 @@ def list_tables(engine, schema: tp.Optional[str] = None):
     list
         list of all table names
     """
-    return sa.inspect(engine).get_table_names(schema=schema)
+    return _inspect(engine).get_table_names(schema=schema)
+
+
+def list_all_tables(engine, max_workers: int = 8) -> tp.Dict[str, tp.List[str]]:
+    """Lists all tables of all schemas.
+
+    The schemas are reflected concurrently, each on its own pooled connection, which helps a lot
+    when the server is far away. Make sure the connection pool of the engine can hold
+    `max_workers` connections. If a connection is given instead, the schemas are reflected one
+    after another over it.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine or sqlalchemy.engine.Connection
+        connection engine to the server
+    max_workers : int
+        maximum number of schemas reflected at the same time
+
+    Returns
+    -------
+    dict
+        a `{schema: table_names}` dictionary mapping each schema returned from
+        :func:`list_schemas` to the list of its table names
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    schemas = list_schemas(engine)
+    # a single connection cannot be used by several threads at once, and an sqlite connection,
+    # notably to an in-memory database, cannot be shared across threads at all
+    if (
+        not schemas
+        or not isinstance(engine, sa.engine.Engine)
+        or engine.dialect.name == "sqlite"
+    ):
+        return {schema: list_tables(engine, schema) for schema in schemas}
+
+    # inspectors are not thread-safe, so each worker reflects through a private one instead of
+    # the one shared via _inspect()
+    local = threading.local()
+
+    def get_table_names(schema):
+        if not hasattr(local, "inspector"):
+            local.inspector = sa.inspect(engine)
+        return local.inspector.get_table_names(schema=schema)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(schemas))) as executor:
+        results = executor.map(get_table_names, schemas)
+        return dict(zip(schemas, results))
 
 
 def list_views(engine, schema: tp.Optional[str] = None):
@@ -336,7 +682,7 @@ def list_views(engine, schema: tp.Optional[str] = None):
     list
         list of all view names
     """
-    return sa.inspect(engine).get_view_names(schema=schema)
+    return _inspect(engine).get_view_names(schema=schema)
 
 
 def table_exists(
@@ -361,7 +707,11 @@ def table_exists(
         whether a table or a view exists with the given name
     """
 
-    return sa.inspect(engine).has_table(table_name, schema=schema)
+    return _inspect(engine).has_table(table_name, schema=schema)
+
+
+# number of ids per INSERT statement, well below the 65535 bind parameters postgres allows
+_TEMP_ID_PAGE_SIZE = 10000
 
 
 def create_temp_id_table(
@@ -386,16 +736,31 @@ def create_temp_id_table(
 
     table_name = f"tab_{uuid.uuid4().hex}"
 
-    query_str = f"CREATE TEMP TABLE {table_name}(id {int_type});"
-    conn.execute(sa.text(query_str))
+    # psycopg 3 can pipeline the DDL and the inserts, saving a round trip per statement
+    driver_conn = conn.connection.driver_connection
+    if hasattr(driver_conn, "pipeline"):
+        pipeline_ctx = driver_conn.pipeline()
+    else:
+        pipeline_ctx = ctx.nullcontext()
+
+    with pipeline_ctx:
+        query_str = f"CREATE TEMP TABLE {table_name}(id {int_type});"
+        conn.exec_driver_sql(query_str)
 
-    values = ",".join((f"({id})" for id in l_ids))
-    query_str = f"INSERT INTO {table_name}(id) VALUES {values};"
-    conn.execute(sa.text(query_str))
+        # one bound multi-row VALUES statement per page of ids. Passing a list of parameters to
+        # execute() instead would fall back to the driver's executemany on postgres dialects,
+        # costing one INSERT per id
+        table = sa.table(table_name, sa.column("id"))
+        for i in range(0, len(l_ids), _TEMP_ID_PAGE_SIZE):
+            page = l_ids[i : i + _TEMP_ID_PAGE_SIZE]
+            conn.execute(table.insert().values([{"id": int(id)} for id in page]))
 
     return table_name
 
 
+_TEMP_TABLE_RE = re.compile(r"mttmp_(\d+)")
+
+
 def temp_table_name(id: int) -> str:
     """Converts a temp table id into a temp table name."""
     return f"mttmp_{id}"
@@ -414,15 +779,16 @@ def temp_table_find_new_id(engine: sa.engine.Engine) -> int:
     id : int
         table id that has not been existent in the public schema.
     """
-    l_tableNames = list_tables(engine)
-    max_id = -1
-    for table_name in l_tableNames:
-        s = re.match(r"mttmp_(\d+)", table_name)
-        if s:
-            id = int(s[1])
-            if max_id < id:
-                max_id = id
-    return max_id + 1
+    if engine.dialect.name == "postgresql":  # let the server do the aggregation
+        sql = r"""
+            SELECT COALESCE(MAX(CAST(SUBSTRING(tablename FROM '^mttmp_(\d+)') AS BIGINT)), -1) + 1
+              FROM pg_tables
+              WHERE schemaname = current_schema() AND tablename ~ '^mttmp_\d'
+        """
+        return engine_execute(engine, sql).scalar()
+
+    matches = (_TEMP_TABLE_RE.match(x) for x in list_tables(engine))
+    return max((int(m[1]) for m in matches if m), default=-1) + 1
 
 
 def temp_table_drop(
@@ -441,4 +807,4 @@ def temp_table_drop(
 
     name = id if isinstance(id, str) else temp_table_name(id)
     sql = f"DROP TABLE IF EXISTS {name}"
-    return engine_execute(engine, sql)
+    return _exec_raw(engine, sql)
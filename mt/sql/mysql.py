@@ -2,12 +2,9 @@
 
 import sqlalchemy as sa
 import pandas as _pd
-import re as _re
-import mt.base.path as _p
-from mt.base.bg_invoke import BgInvoke
-import mt.pandas.csv as _mc
 
 from .base import *
+from .base import _exec_raw
 
 
 __all__ = [
@@ -23,6 +20,23 @@ __all__ = [
 # MT-TODO: any function below this line needs testing
 
 
+def _quote(name, engine):
+    """Quotes an identifier the way the engine's dialect does.
+
+    Percent signs are left as-is, since :func:`mt.sql.base._exec_raw` escapes them itself.
+    """
+    preparer = engine.dialect.identifier_preparer
+    name = name.replace(preparer.escape_quote, preparer.escape_to_quote)
+    return preparer.initial_quote + name + preparer.final_quote
+
+
+def _frame(table_name, engine, schema=None):
+    """Returns the quoted, optionally schema-qualified, name of a table."""
+    if schema is None:
+        return _quote(table_name, engine)
+    return _quote(schema, engine) + "." + _quote(table_name, engine)
+
+
 def list_views(db_name, engine):
     """Lists all views of a given database.
 
@@ -39,9 +53,10 @@ def list_views(db_name, engine):
         list of all view names
     """
     text_sql = sa.text(
-        "SHOW FULL TABLES IN '{}' WHERE TABLE_TYPE LIKE 'VIEW';".format(db_name)
+        "SELECT table_name AS viewname FROM information_schema.views"
+        " WHERE table_schema = :db_name;"
     )
-    df = _pd.read_sql_query(text_sql, engine)
+    df = _pd.read_sql_query(text_sql, engine, params={"db_name": db_name})
     return df["viewname"].tolist()
 
 
@@ -59,15 +74,10 @@ def rename_table(old_table_name, new_table_name, engine, schema=None):
     schema : str or None
         schema name
     """
-    if schema is None:
-        query_str = 'ALTER TABLE "{}" RENAME TO "{}";'.format(
-            old_table_name, new_table_name
-        )
-    else:
-        query_str = 'ALTER TABLE "{}"."{}" RENAME TO "{}";'.format(
-            schema, old_table_name, new_table_name
-        )
-    engine_execute(engine, query_str)
+    query_str = "ALTER TABLE {} RENAME TO {};".format(
+        _frame(old_table_name, engine, schema=schema), _quote(new_table_name, engine)
+    )
+    _exec_raw(engine, query_str)
 
 
 def list_columns_ext(table_name, engine, schema=None):
@@ -89,18 +99,12 @@ def list_columns_ext(table_name, engine, schema=None):
     out : pandas.DataFrame
         a table of details of the columns
     """
-    if schema is None:
-        query_str = (
-            "select * from information_schema.columns where table_name='{}';".format(
-                table_name
-            )
-        )
-    else:
-        query_str = "select * from information_schema.columns where table_schema='{}' and table_name='{}';".format(
-            schema, table_name
-        )
-    text_sql = sa.text(query_str) if isinstance(query_str, str) else query_str
-    return _pd.read_sql_query(text_sql, engine)
+    query_str = "select * from information_schema.columns where table_name = :table_name"
+    params = {"table_name": table_name}
+    if schema is not None:
+        query_str += " and table_schema = :schema"
+        params["schema"] = schema
+    return _pd.read_sql_query(sa.text(query_str), engine, params=params)
 
 
 def list_columns(table_name, engine, schema=None):
@@ -138,16 +142,12 @@ def rename_column(table_name, old_column_name, new_column_name, engine, schema=N
     schema : str or None
         schema name
     """
-    old_column_name = old_column_name.replace("%", "%%")
-    if schema is None:
-        query_str = 'ALTER TABLE "{}" RENAME COLUMN "{}" TO "{}";'.format(
-            table_name, old_column_name, new_column_name
-        )
-    else:
-        query_str = 'ALTER TABLE "{}"."{}" RENAME COLUMN "{}" TO "{}";'.format(
-            schema, table_name, old_column_name, new_column_name
-        )
-    engine_execute(engine, query_str)
+    query_str = "ALTER TABLE {} RENAME COLUMN {} TO {};".format(
+        _frame(table_name, engine, schema=schema),
+        _quote(old_column_name, engine),
+        _quote(new_column_name, engine),
+    )
+    _exec_raw(engine, query_str)
 
 
 def drop_column(table_name, column_name, engine, schema=None):
@@ -164,11 +164,7 @@ def drop_column(table_name, column_name, engine, schema=None):
     schema : str or None
         schema name
     """
-    column_name = column_name.replace("%", "%%")
-    if schema is None:
-        query_str = 'ALTER TABLE "{}" DROP COLUMN "{}";'.format(table_name, column_name)
-    else:
-        query_str = 'ALTER TABLE "{}"."{}" DROP COLUMN "{}";'.format(
-            schema, table_name, column_name
-        )
-    engine_execute(engine, query_str)
+    query_str = "ALTER TABLE {} DROP COLUMN {};".format(
+        _frame(table_name, engine, schema=schema), _quote(column_name, engine)
+    )
+    _exec_raw(engine, query_str)
@@ -1,33 +1,218 @@
 """Base functions dealing with an sqlite3 file database."""
 
 import typing as tp
+import functools
+import contextvars
+from contextlib import contextmanager
 
 import sqlalchemy as sa
 
 from mt import path, logg
 
 from .base import (
-    frame_sql,
     list_tables,
     exec_sql,
     read_sql,
     engine_execute,
+    run_func,
+    conn_ctx,
 )
 
 
 __all__ = [
+    "sqlite_session",
+    "batch_ddl",
     "list_schemas",
     "rename_table",
     "drop_table",
     "rename_column",
     "get_table_sql_code",
     "list_indices",
+    "list_indices_for",
     "make_index",
     "vacuum",
+    "enable_incremental_autovacuum",
+    "incremental_vacuum",
+    "integrity_check",
+    "optimize",
+    "analyze",
     "clone_database",
+    "tune_engine",
 ]
 
 
+# trade a little durability on power loss for far fewer fsyncs, and serve reads from memory
+_PERFORMANCE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA cache_size=-16384;",  # 16 MiB page cache
+    "PRAGMA mmap_size=268435456;",  # 256 MiB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY;",
+)
+
+
+def _tune_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _PERFORMANCE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _optimize_connection(dbapi_connection, connection_record):
+    try:
+        dbapi_connection.execute("PRAGMA optimize;")
+    except Exception:  # closing a connection must never fail because of this
+        pass
+
+
+def tune_engine(engine):
+    """Applies performance-oriented PRAGMAs to every new connection of an sqlite engine.
+
+    The database is switched to write-ahead logging with `synchronous=NORMAL`, a 16 MiB page
+    cache, 256 MiB of memory-mapped I/O and in-memory temporary storage. Connections opened before
+    the call are not affected, so it is best invoked right after creating the engine. In addition,
+    `PRAGMA optimize` is run on each connection right before it is closed. Invoking the function
+    more than once is harmless.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        connection engine to an sqlite3 database
+
+    Returns
+    -------
+    sqlalchemy.engine.Engine
+        the same engine, for convenience
+    """
+    if not sa.event.contains(engine, "connect", _tune_connection):
+        sa.event.listen(engine, "connect", _tune_connection)
+    if not sa.event.contains(engine, "close", _optimize_connection):
+        sa.event.listen(engine, "close", _optimize_connection)
+    return engine
+
+
+def _ident(name: str) -> str:
+    """Quotes an identifier, so that it can be safely interpolated into an SQL string.
+
+    Backticks are used because, unlike double quotes, sqlite never falls back to reading them as a
+    string literal when no such column exists.
+    """
+    return "`" + name.replace("`", "``") + "`"
+
+
+@functools.lru_cache(maxsize=4096)
+def _frame_ident(frame_name: str, schema: tp.Optional[str] = None) -> str:
+    """Like :func:`mt.sql.base.frame_sql` but with the identifiers quoted.
+
+    Results are cached, as bulk maintenance tends to frame the same few tables over and over.
+    """
+    if schema is None:
+        return _ident(frame_name)
+    return _ident(schema) + "." + _ident(frame_name)
+
+
+# (engine, connection) of the innermost active sqlite_session(), if any
+_session = contextvars.ContextVar("mt_sql_sqlite_session", default=None)
+
+
+@contextmanager
+def sqlite_session(engine):
+    """Reuses a single connection for the helpers of this module invoked within the block.
+
+    Opening an sqlite connection touches the file system, which dominates the cost of cheap helpers
+    like :func:`make_index` or :func:`rename_column` when they are invoked in a loop. Within the
+    block, the helpers of this module that are invoked with `engine` run on the yielded connection
+    instead of checking out a new one each time. The block runs in a single transaction, DDL
+    included, which is committed at the end of the block or rolled back if the block raises. The
+    session is bound to the current thread or asyncio task. Nested sessions of the same engine
+    share the outer connection.
+
+    :func:`vacuum`, :func:`incremental_vacuum` and :func:`enable_incremental_autovacuum` always use
+    their own connection, since sqlite refuses to vacuum inside a transaction and the sqlite3
+    driver commits any pending transaction before running a script. Do not invoke them after the
+    block has written anything, as the database stays locked until the block ends.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        connection engine to an sqlite3 database
+
+    Yields
+    ------
+    sqlalchemy.engine.Connection
+        the connection in use
+    """
+    session = _session.get()
+    if session is not None and session[0] is engine:
+        yield session[1]
+        return
+
+    with engine.begin() as conn:
+        # the sqlite3 driver does not begin a transaction until the first DML statement, and
+        # never for DDL, so the transaction is begun explicitly
+        conn.exec_driver_sql("BEGIN;")
+        token = _session.set((engine, conn))
+        try:
+            yield conn
+        finally:
+            _session.reset(token)
+
+
+def _bind(engine):
+    """Returns the connection of the active :func:`sqlite_session` of `engine`, or `engine`."""
+    session = _session.get()
+    if session is not None and session[0] is engine:
+        return session[1]
+    return engine
+
+
+def _batch_ddl(engine, stmts):
+    res = None
+    with conn_ctx(engine) as conn:
+        # the sqlite3 driver opens no transaction for DDL, so a savepoint is what makes the list
+        # atomic. Unlike BEGIN, it also nests within the transaction of a sqlite_session
+        conn.exec_driver_sql("SAVEPOINT mt_batch_ddl;")
+        try:
+            for stmt in stmts:
+                res = conn.exec_driver_sql(stmt)
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK TO mt_batch_ddl;")
+            conn.exec_driver_sql("RELEASE mt_batch_ddl;")
+            raise
+        conn.exec_driver_sql("RELEASE mt_batch_ddl;")
+    return res
+
+
+def batch_ddl(engine, stmts: tp.List[str], nb_trials: int = 3, logger=None):
+    """Executes a list of DDL statements over a single connection.
+
+    The statements are passed as-is to the sqlite3 driver, skipping sqlalchemy's compilation, and
+    they share one connection checkout. They are applied atomically: if one of them fails, the
+    ones before it are rolled back, and the next attempt retries the whole list.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        connection engine to an sqlite3 database
+    stmts : list
+        list of SQL strings without parameters
+    nb_trials: int
+        number of query trials
+    logger: logging.Logger or None
+        logger for debugging
+
+    Returns
+    -------
+    sqlalchemy.engine.CursorResult or None
+        the result of the last statement, or None if there is no statement
+    """
+    return run_func(
+        _batch_ddl, _bind(engine), stmts, nb_trials=nb_trials, logger=logger
+    )
+
+
 def list_schemas(engine, nb_trials: int = 3, logger=None):
     """Lists all schemas/attached databases of an sqlite engine.
 
@@ -47,7 +232,7 @@ def list_schemas(engine, nb_trials: int = 3, logger=None):
         names and files
     """
     query_str = "PRAGMA database_list;"
-    return read_sql(query_str, engine, nb_trials=nb_trials, logger=logger)
+    return read_sql(query_str, _bind(engine), nb_trials=nb_trials, logger=logger)
 
 
 def rename_table(
@@ -77,11 +262,13 @@ def rename_table(
 
     Returns
     -------
-    whatever exec_sql() returns
+    whatever batch_ddl() returns
     """
-    frame_sql_str = frame_sql(old_table_name, schema=schema)
-    query_str = 'ALTER TABLE {} RENAME TO "{}";'.format(frame_sql_str, new_table_name)
-    exec_sql(query_str, engine, nb_trials=nb_trials, logger=logger)
+    frame_sql_str = _frame_ident(old_table_name, schema=schema)
+    query_str = "ALTER TABLE {} RENAME TO {};".format(
+        frame_sql_str, _ident(new_table_name)
+    )
+    return batch_ddl(engine, [query_str], nb_trials=nb_trials, logger=logger)
 
 
 def drop_table(
@@ -104,11 +291,11 @@ def drop_table(
 
     Returns
     -------
-    whatever exec_sql() returns
+    whatever batch_ddl() returns
     """
-    frame_sql_str = frame_sql(table_name, schema=schema)
+    frame_sql_str = _frame_ident(table_name, schema=schema)
     query_str = "DROP TABLE IF EXISTS {};".format(frame_sql_str)
-    return exec_sql(query_str, engine, nb_trials=nb_trials, logger=logger)
+    return batch_ddl(engine, [query_str], nb_trials=nb_trials, logger=logger)
 
 
 def rename_column(
@@ -139,11 +326,11 @@ def rename_column(
     logger: logging.Logger or None
         logger for debugging
     """
-    frame_sql_str = frame_sql(table_name, schema=schema)
+    frame_sql_str = _frame_ident(table_name, schema=schema)
     query_str = "ALTER TABLE {} RENAME COLUMN {} TO {};".format(
-        frame_sql_str, old_column_name, new_column_name
+        frame_sql_str, _ident(old_column_name), _ident(new_column_name)
     )
-    exec_sql(query_str, engine, nb_trials=nb_trials, logger=logger)
+    batch_ddl(engine, [query_str], nb_trials=nb_trials, logger=logger)
 
 
 def get_table_sql_code(table_name, engine, nb_trials: int = 3, logger=None):
@@ -162,15 +349,18 @@ def get_table_sql_code(table_name, engine, nb_trials: int = 3, logger=None):
 
     Returns
     -------
-    retval: str
-        SQL query string defining the table
+    retval: str or None
+        SQL query string defining the table, or None if the table does not exist
     """
-    query_str = (
-        "SELECT sql FROM sqlite_master WHERE type='table' AND name='{}';".format(
-            table_name
-        )
+    query_str = "SELECT sql FROM sqlite_master WHERE type='table' AND name=:name;"
+    res = exec_sql(
+        query_str,
+        _bind(engine),
+        {"name": table_name},
+        nb_trials=nb_trials,
+        logger=logger,
     )
-    return read_sql(query_str, engine, nb_trials=nb_trials, logger=logger)["sql"][0]
+    return res.scalar()
 
 
 def list_indices(engine, nb_trials: int = 3, logger=None):
@@ -193,18 +383,48 @@ def list_indices(engine, nb_trials: int = 3, logger=None):
         that maps an indexed column of the table to an SQL query that defines the index.
     """
     query_str = "SELECT name, tbl_name, sql FROM sqlite_master WHERE type='index';"
-    df = read_sql(query_str, engine, nb_trials=nb_trials, logger=logger)
+    rows = exec_sql(query_str, _bind(engine), nb_trials=nb_trials, logger=logger)
     res = {}
-    for _, row in df.iterrows():
-        table_name = row["tbl_name"]
-        if not table_name in res:
-            res[table_name] = {}
-        res2 = res[table_name]
-        index_name = row["name"][len(table_name) + 4 :]
-        res2[index_name] = row["sql"]
+    for name, tbl_name, sql in rows:
+        # strip the 'ix_<table_name>_' prefix from each index name
+        res.setdefault(tbl_name, {})[name[len(tbl_name) + 4 :]] = sql
     return res
 
 
+def list_indices_for(table_name, engine, nb_trials: int = 3, logger=None):
+    """Lists the indices of a single table.
+
+    Only the indices of the table are fetched, unlike :func:`list_indices`.
+
+    Parameters
+    ----------
+    table_name: str
+        table name
+    engine: sqlalchemy.engine.Engine
+        an sqlalchemy sqlite3 connection engine created by function `create_engine()`
+    nb_trials: int
+        number of query trials
+    logger: logging.Logger or None
+        logger for debugging
+
+    Returns
+    -------
+    index_dict : dict
+        a dictionary that maps each indexed column of the table to an SQL query that defines the
+        index. It is empty if the table has no index.
+    """
+    query_str = "SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=:tbl_name;"
+    rows = exec_sql(
+        query_str,
+        _bind(engine),
+        {"tbl_name": table_name},
+        nb_trials=nb_trials,
+        logger=logger,
+    )
+    # strip the 'ix_<table_name>_' prefix from each index name
+    return {name[len(table_name) + 4 :]: sql for name, sql in rows}
+
+
 def make_index(
     table_name: str, index_col: str, engine, nb_trials: int = 3, logger=None
 ):
@@ -229,23 +449,26 @@ def make_index(
         True if a new index has been created. False if the index exists
     """
 
-    indices = list_indices(engine, nb_trials=nb_trials, logger=logger)
-    if table_name in indices and index_col in indices[table_name]:
+    # sqlite bumps the schema version on every schema change, so it tells whether anything was
+    # created without having to list the indices beforehand
+    version = engine_execute(_bind(engine), "PRAGMA schema_version;").scalar()
+    query_str = "CREATE INDEX IF NOT EXISTS {} ON {} ({})".format(
+        _ident(f"ix_{table_name}_{index_col}"), _ident(table_name), _ident(index_col)
+    )
+    batch_ddl(engine, [query_str], nb_trials=nb_trials, logger=logger)
+    if engine_execute(_bind(engine), "PRAGMA schema_version;").scalar() == version:
         return False
 
-    query_str = (
-        "CREATE INDEX ix_{table_name}_{index_col} ON {table_name} ({index_col})".format(
-            table_name=table_name,
-            index_col=index_col,
-        )
-    )
-    engine_execute(engine, query_str)
+    analyze(engine, table_name)
     return True
 
 
 def vacuum(engine):
     """Makes the sqlite file as compact as possible.
 
+    The whole database file is rewritten while holding an exclusive lock, which can take very long
+    for a large database. Consider :func:`incremental_vacuum` instead for routine maintenance.
+
     Parameters
     ----------
     engine : sqlalchemy.engine.Engine
@@ -254,16 +477,90 @@ def vacuum(engine):
     engine_execute(engine, "VACUUM;")
 
 
-def integrity_check(engine):
+def _executescript(engine, script: str):
+    # unlike cursor.execute(), executescript() steps each statement to completion
+    with conn_ctx(engine) as conn:
+        conn.connection.driver_connection.executescript(script)
+
+
+def enable_incremental_autovacuum(engine):
+    """Switches a database to `auto_vacuum=INCREMENTAL` mode.
+
+    In that mode, free pages can be released a few at a time with :func:`incremental_vacuum`
+    instead of rewriting the whole file with :func:`vacuum`. Changing the mode requires a full
+    vacuum, which is done here, so the function is meant to be invoked once, ideally right after
+    creating the database.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        connection engine to an sqlite3 database
+    """
+    _executescript(engine, "PRAGMA auto_vacuum=INCREMENTAL; VACUUM;")
+
+
+def incremental_vacuum(engine, pages: int = 1000):
+    """Releases free pages of a database back to the file system, a bounded number at a time.
+
+    Unlike :func:`vacuum`, the work done and the time the database stays locked are bounded by
+    `pages`. It only has an effect on a database in `auto_vacuum=INCREMENTAL` mode, see
+    :func:`enable_incremental_autovacuum`.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        connection engine to an sqlite3 database
+    pages : int
+        maximum number of free pages to release. If not positive, all free pages are released.
+    """
+    _executescript(engine, f"PRAGMA incremental_vacuum({int(pages)});")
+
+
+def optimize(engine):
+    """Lets sqlite refresh the statistics its query planner relies on, where needed.
+
+    It is cheap, and connections of an engine set up by :func:`tune_engine` run it on closing.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        connection engine to an sqlite3 database
+    """
+    engine_execute(_bind(engine), "PRAGMA optimize;")
+
+
+def analyze(engine, table_name: tp.Optional[str] = None):
+    """Gathers the statistics the query planner relies on, unconditionally.
+
+    Unlike :func:`optimize`, the statistics are always recomputed, so that, for example, a newly
+    created index is taken into account by the planner right away.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        connection engine to an sqlite3 database
+    table_name : str, optional
+        table, together with its indices, to analyze. If not provided, the whole database is
+        analyzed.
+    """
+    query_str = "ANALYZE;" if table_name is None else f"ANALYZE {_ident(table_name)};"
+    engine_execute(_bind(engine), query_str)
+
+
+def integrity_check(engine, quick: bool = True):
     """Checks the integrity of a database.
 
     Parameters
     ----------
     engine : sqlalchemy.engine.Engine
         connection engine to an sqlite3 database
+    quick : bool
+        whether to run `PRAGMA quick_check`, which is much faster on a large database but does not
+        verify that indices match their tables nor that UNIQUE constraints hold, or the full
+        `PRAGMA integrity_check`
     """
-    query_str = "pragma integrity_check;"
-    return engine_execute(engine, query_str)
+    query_str = "pragma quick_check;" if quick else "pragma integrity_check;"
+    return engine_execute(_bind(engine), query_str)
 
 
 def clone_database(src_filepath, dst_filepath, logger=None):
@@ -290,24 +587,24 @@ def clone_database(src_filepath, dst_filepath, logger=None):
         sa.create_engine("sqlite:///" + dst_filepath)
 
     src_engine = sa.create_engine("sqlite:///" + src_filepath)
-    l_tableNames = list_tables(src_engine, logger=logger)
+    l_tableNames = list_tables(src_engine)
     with logg.scoped_info("Cloning {} tables".format(len(l_tableNames)), logger=logger):
         if logger:
             logger.info("Src filepath: {}".format(src_filepath))
             logger.info("Dst filepath: {}".format(dst_filepath))
 
-        src_engine_execute(
-            engine, "ATTACH DATABASE '{}' AS other;".format(dst_filepath)
+        engine_execute(
+            src_engine, "ATTACH DATABASE :filepath AS other;", {"filepath": dst_filepath}
         )
 
         for table_name in l_tableNames:
             if logger:
                 logger.info("Table: {}".format(table_name))
-            src_engine_execute(
-                engine,
+            engine_execute(
+                src_engine,
                 "INSERT INTO other.{table_name} SELECT * FROM main.{table_name};".format(
-                    table_name=table_name
+                    table_name=_ident(table_name)
                 ),
             )
 
-        src_engine_execute(engine, "DETACH other;")
+        engine_execute(src_engine, "DETACH other;")
@@ -1,5 +1,5 @@
 MAJOR_VERSION = 1
 MINOR_VERSION = 12
 PATCH_VERSION = 2
-version = '{}.{}.{}'.format(MAJOR_VERSION, MINOR_VERSION, PATCH_VERSION)
+version = '1.12.2'
 __all__  = ['MAJOR_VERSION', 'MINOR_VERSION', 'PATCH_VERSION', 'version']